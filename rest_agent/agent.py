@@ -1,41 +1,522 @@
 """A simple REST API agent."""
-import requests
+import asyncio
+import ipaddress
+import random
+import socket
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+from aiolimiter import AsyncLimiter
+import ijson
+import orjson
 from google.adk.agents import Agent
 
-def make_request(url: str) -> dict:
+# Retry transient failures (connection resets, 429s, 5xx) with exponential
+# backoff so one network hiccup doesn't surface as a tool error.
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 1.0
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Advertising compression is free bandwidth: aiohttp decompresses
+# transparently in C, and text/JSON payloads typically shrink 3-10x.
+# Only encodings this aiohttp can actually decode belong here — it has
+# no zstd support, so advertising it would fetch undecodable frames.
+_DEFAULT_HEADERS = {
+    "User-Agent": "rest_agent/1.0",
+    "Accept": "application/json, */*;q=0.1",
+    "Accept-Encoding": "gzip, br",
+    "Connection": "keep-alive",
+}
+
+# (connect, total) timeouts so one slow server can't wedge the tool loop.
+_TIMEOUT = (3.05, 30)
+
+# Keep resolved addresses warm: DNS adds 5-40ms on the first dial to each
+# host. The connector caches via aiodns below; the host checks get a
+# TTL'd getaddrinfo cache.
+_DNS_TTL = 300
+
+@lru_cache(maxsize=4096)
+def _resolve_cached(host: str, ttl_bucket: int) -> tuple:
+    return tuple({info[4][0] for info in socket.getaddrinfo(host, None)})
+
+def _resolve_host(host: str) -> tuple:
+    """Resolved addresses for a host, cached for up to _DNS_TTL seconds."""
+    return _resolve_cached(host, int(time.monotonic() // _DNS_TTL))
+
+def _is_forbidden_address(addr: str) -> bool:
+    """Private/link-local/loopback space is never a legitimate target here."""
+    ip = ipaddress.ip_address(addr)
+    return ip.is_private or ip.is_loopback or ip.is_link_local
+
+class _PrivateAddressBlockingResolver(aiohttp.abc.AbstractResolver):
+    """AsyncResolver wrapper that refuses private/link-local addresses.
+
+    Enforcing the block where connections are actually dialed covers the
+    answers aiohttp resolves for itself — including DNS rebinding, where
+    the pre-flight getaddrinfo check and the connector's resolver could
+    disagree.
+    """
+
+    def __init__(self):
+        self._resolver = aiohttp.AsyncResolver()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        hosts = await self._resolver.resolve(host, port, family)
+        for entry in hosts:
+            if _is_forbidden_address(entry["host"]):
+                raise OSError(
+                    f"refusing to connect to private address for host {host}"
+                )
+        return hosts
+
+    async def close(self):
+        await self._resolver.close()
+
+# Async session for the tool path: one event loop can overlap many GETs
+# instead of blocking a thread per request. Created lazily so it binds to
+# the loop the ADK runtime actually runs tools on.
+_AIO_TIMEOUT = aiohttp.ClientTimeout(connect=_TIMEOUT[0], total=_TIMEOUT[1])
+_MAX_IN_FLIGHT = 64
+_aio_session = None
+_aio_semaphore = None
+
+def _get_aio_session() -> aiohttp.ClientSession:
+    global _aio_session, _aio_semaphore
+    if _aio_session is None or _aio_session.closed:
+        _aio_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=1024,
+                limit_per_host=64,
+                resolver=_PrivateAddressBlockingResolver(),
+                use_dns_cache=True,
+                ttl_dns_cache=_DNS_TTL,
+            ),
+            timeout=_AIO_TIMEOUT,
+            headers=dict(_DEFAULT_HEADERS),
+        )
+        _aio_semaphore = asyncio.Semaphore(_MAX_IN_FLIGHT)
+        # Limiters bind to the loop they first run on, like the semaphore;
+        # drop them so a session rebuilt on a new loop gets fresh ones.
+        _host_limiters.clear()
+    return _aio_session
+
+def _invalid_url(url: str):
+    """Return an error string for URLs that could never succeed, else None.
+
+    LLM-produced URLs are sometimes malformed or non-http; failing them
+    here costs microseconds instead of a connection-pool slot and a
+    timeout.
+    """
     try:
-        # Make the GET request
-        response = requests.get(url)
-        
-        # Check if the request was successful
-        if response.status_code == 200:
-            # Try to parse JSON response
-            try:
-                data = response.json()
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": data
-                }
-            except ValueError:
-                # If response is not JSON, return text
-                return {
-                    "success": True,
-                    "status_code": response.status_code,
-                    "data": response.text
-                }
-        else:
+        parts = urlsplit(url)
+    except ValueError as e:
+        # urlsplit itself rejects some inputs (e.g. bad IPv6 brackets)
+        return f"Invalid URL: {url} ({str(e)})"
+    if parts.scheme not in ("http", "https"):
+        return f"Invalid URL scheme: {url}"
+    if not parts.netloc:
+        return f"Invalid URL (no host): {url}"
+    return None
+
+def _blocked_host(host: str):
+    """Return an error string for hosts we refuse to dial, else None.
+
+    Private/link-local/loopback targets are unreachable from this agent
+    and would just burn the full timeout budget; they are also classic
+    SSRF bait for an LLM-produced URL. Resolution goes through the TTL'd
+    DNS cache, so the check is a dict lookup on the hot path.
+    """
+    try:
+        addresses = _resolve_host(host)
+    except socket.gaierror as e:
+        return f"DNS resolution failed for {host}: {str(e)}"
+    for addr in addresses:
+        if _is_forbidden_address(addr):
+            return f"Refusing to request private address for host {host}"
+    return None
+
+@lru_cache(maxsize=1024)
+def _host_of(url: str) -> str:
+    """Hostname of a URL, memoized since the agent tends to hammer one API."""
+    try:
+        return urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+
+# Token-bucket limiter per hostname so fan-out stays under server rate
+# limits instead of absorbing 429s and backoff stalls.
+_HOST_RATE_LIMIT = 8  # requests per second per host
+_host_limiters = {}
+
+def _host_limiter(url: str) -> AsyncLimiter:
+    host = _host_of(url)
+    limiter = _host_limiters.get(host)
+    if limiter is None:
+        limiter = _host_limiters[host] = AsyncLimiter(_HOST_RATE_LIMIT, 1)
+    return limiter
+
+# Ceiling on any one backoff sleep (matches urllib3's DEFAULT_BACKOFF_MAX)
+# so a hostile Retry-After can't park a tool call for hours.
+_RETRY_BACKOFF_MAX = 120.0
+
+def _retry_delay(attempt: int, retry_after: str = None) -> float:
+    """Backoff delay for the async retry loop, honoring a capped Retry-After."""
+    if retry_after:
+        try:
+            return min(float(retry_after), _RETRY_BACKOFF_MAX)
+        except ValueError:
+            pass
+    delay = _RETRY_BACKOFF * (2 ** attempt) * (1 + random.random() * 0.5)
+    return min(delay, _RETRY_BACKOFF_MAX)
+
+# Redirects are followed by hand so every hop's target gets the same
+# scheme/host validation as the original URL.
+_REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+_MAX_REDIRECTS = 10
+
+def _redirect_hop(url: str, location: str):
+    """Validated absolute URL for a redirect, or (None, error string)."""
+    next_url = urljoin(url, location)
+    error = _invalid_url(next_url) or _blocked_host(_host_of(next_url))
+    if error:
+        return None, f"Blocked redirect to {next_url}: {error}"
+    return next_url, None
+
+# LRU cache of url -> (etag, last_modified, data) used for conditional GETs.
+# A 304 lets us return the cached payload without re-downloading or
+# re-parsing the body.
+_ETAG_CACHE = OrderedDict()
+_ETAG_CACHE_SIZE = 256
+
+# JSON bodies at or above this size are parsed incrementally off the wire
+# instead of being buffered whole and then parsed (two copies in memory).
+_STREAM_JSON_THRESHOLD = 1 << 20  # 1 MiB
+
+def _is_json_content(response) -> bool:
+    """Dispatch on the declared Content-Type instead of parse-and-catch."""
+    ctype = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+    return ctype == "application/json" or ctype.endswith("+json")
+
+def _should_stream_json(response) -> bool:
+    """Return True when the body is JSON and big enough to parse incrementally."""
+    if not _is_json_content(response):
+        return False
+    try:
+        return int(response.headers.get("Content-Length", 0)) >= _STREAM_JSON_THRESHOLD
+    except ValueError:
+        return False
+
+async def _body_text(response) -> str:
+    """Body as text, decoding with replacement instead of raising.
+
+    aiohttp's text() is strict by default, so a binary or mis-labeled
+    body would raise UnicodeDecodeError out of the tool; requests' .text
+    never did that, and neither should we.
+    """
+    try:
+        return await response.text(errors="replace")
+    except (LookupError, UnicodeDecodeError):
+        # A bogus charset= parameter can still break encoding lookup
+        return (await response.read()).decode("utf-8", errors="replace")
+
+def _conditional_headers(url: str, decoded: bool):
+    """Build If-None-Match/If-Modified-Since headers for a cached URL.
+
+    Only offers validators when the cached payload was stored in the same
+    form (decoded dict vs raw text) the caller is asking for. Returns
+    None when there is nothing to add so the session-level defaults are
+    used without a per-request merge.
+    """
+    cached = _ETAG_CACHE.get(url)
+    if cached is None or cached[3] != decoded:
+        return None
+    etag, last_modified, _, _ = cached
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers or None
+
+def _cache_response(url: str, response, data, decoded: bool) -> None:
+    """Remember the validators and payload for a successful GET."""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        _ETAG_CACHE.pop(url, None)
+        return
+    _ETAG_CACHE[url] = (etag, last_modified, data, decoded)
+    _ETAG_CACHE.move_to_end(url)
+    while len(_ETAG_CACHE) > _ETAG_CACHE_SIZE:
+        _ETAG_CACHE.popitem(last=False)
+
+# Copying a prebuilt dict is cheaper in CPython than building a fresh
+# literal per call — it shows up under heavy fan-out.
+_SUCCESS_TEMPLATE = {"success": True, "status_code": 0, "data": None}
+
+def _success(status_code: int, data) -> dict:
+    result = _SUCCESS_TEMPLATE.copy()
+    result["status_code"] = status_code
+    result["data"] = data
+    return result
+
+async def aclose_session():
+    """Close the shared async session, if one was created."""
+    if _aio_session is not None and not _aio_session.closed:
+        await _aio_session.close()
+
+async def probe_request(url: str) -> dict:
+    """Issue a HEAD request and return status and headers without the body.
+
+    Lets the agent check size/type of a large resource in one RTT instead
+    of downloading it.
+    """
+    error = _invalid_url(url) or _blocked_host(_host_of(url))
+    if error:
+        return {
+            "success": False,
+            "error": error
+        }
+    session = _get_aio_session()
+    try:
+        hops = 0
+        while True:
+            async with _aio_semaphore:
+                async with _host_limiter(url):
+                    response = await session.head(url, allow_redirects=False)
+                headers = dict(response.headers)
+                status = response.status
+                location = response.headers.get("Location")
+                response.release()
+            # Follow redirects by hand so every hop gets validated, with
+            # the same failure modes as make_request
+            if status in _REDIRECT_STATUSES:
+                if not location:
+                    return {
+                        "success": False,
+                        "status_code": status,
+                        "error": "Redirect without a Location header"
+                    }
+                if hops >= _MAX_REDIRECTS:
+                    return {
+                        "success": False,
+                        "status_code": status,
+                        "error": f"Too many redirects (>{_MAX_REDIRECTS})"
+                    }
+                next_url, error = _redirect_hop(url, location)
+                if error:
+                    return {
+                        "success": False,
+                        "error": error
+                    }
+                url = next_url
+                hops += 1
+                continue
             return {
-                "success": False,
-                "status_code": response.status_code,
-                "error": f"Request failed with status code {response.status_code}"
+                "success": status < 400,
+                "status_code": status,
+                "headers": headers
             }
-    except requests.exceptions.RequestException as e:
+    except asyncio.TimeoutError as e:
+        return {
+            "success": False,
+            "error": f"Request timed out: {str(e)}"
+        }
+    except aiohttp.ClientError as e:
         return {
             "success": False,
             "error": f"Request failed: {str(e)}"
         }
 
+async def make_request(url: str, decode_json: bool = False,
+                       max_bytes: int = 0) -> dict:
+    """Make a GET request to a URL and return the response as a dict.
+
+    By default the body comes back as text exactly as received. Pass
+    decode_json=True to parse JSON bodies into structured data, and
+    max_bytes > 0 to download only the first max_bytes bytes of a large
+    resource via a Range request.
+    """
+    error = _invalid_url(url) or _blocked_host(_host_of(url))
+    if error:
+        return {
+            "success": False,
+            "error": error
+        }
+    session = _get_aio_session()
+    try:
+        # Make the GET request, conditionally if we hold cached
+        # validators; retry transient statuses with backoff. A ranged
+        # request caps the download instead of validating the cache.
+        if max_bytes > 0:
+            request_headers = {"Range": f"bytes=0-{max_bytes - 1}"}
+        else:
+            request_headers = _conditional_headers(url, decode_json)
+        attempt = 0
+        hops = 0
+        while True:
+            delay = None
+            async with _aio_semaphore:
+                response = None
+                try:
+                    async with _host_limiter(url):
+                        response = await session.get(
+                            url, headers=request_headers, allow_redirects=False
+                        )
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    # Connection resets and timeouts are as transient as a
+                    # 503; the final attempt re-raises into the handlers
+                    # below
+                    if attempt >= _RETRY_TOTAL:
+                        raise
+                    delay = _retry_delay(attempt)
+                    attempt += 1
+                if response is None:
+                    pass  # transient fault caught above; back off and retry
+                elif response.status in _RETRY_STATUSES and attempt < _RETRY_TOTAL:
+                    retry_after = response.headers.get("Retry-After")
+                    response.release()
+                    delay = _retry_delay(attempt, retry_after)
+                    attempt += 1
+                else:
+                    try:
+                        # Follow redirects by hand, validating each hop
+                        # target like the original URL
+                        if response.status in _REDIRECT_STATUSES:
+                            location = response.headers.get("Location")
+                            if not location:
+                                return {
+                                    "success": False,
+                                    "status_code": response.status,
+                                    "error": "Redirect without a Location header"
+                                }
+                            if hops >= _MAX_REDIRECTS:
+                                return {
+                                    "success": False,
+                                    "status_code": response.status,
+                                    "error": f"Too many redirects (>{_MAX_REDIRECTS})"
+                                }
+                            next_url, error = _redirect_hop(url, location)
+                            if error:
+                                return {
+                                    "success": False,
+                                    "error": error
+                                }
+                            url = next_url
+                            hops += 1
+                            continue
+
+                        # Resource unchanged: serve the cached payload
+                        # without re-parsing
+                        if response.status == 304:
+                            if url in _ETAG_CACHE:
+                                _ETAG_CACHE.move_to_end(url)
+                                return _success(response.status, _ETAG_CACHE[url][2])
+                            # Entry evicted between sending validators and
+                            # the 304 (possible under fan-out with the
+                            # small LRU); refetch unconditionally instead
+                            # of failing a 304 we provoked. Without
+                            # validators the next response can't be 304
+                            # again, so this loops at most once.
+                            request_headers = None
+                            continue
+
+                        # Check if the request was successful (206 = the
+                        # partial body we asked for with Range)
+                        if response.status == 200 or (max_bytes > 0 and response.status == 206):
+                            if not decode_json:
+                                # ADK serializes the tool result right back
+                                # to a string for the LLM, so skip the parse
+                                # and hand the body through as-is
+                                data = await _body_text(response)
+                            elif _should_stream_json(response):
+                                # Large JSON: parse straight off the socket
+                                # without buffering the whole body first.
+                                # Truncated or malformed bodies raise
+                                # ijson.JSONError, which must not escape
+                                # into a gather()ed batch.
+                                data = None
+                                parsed = False
+                                try:
+                                    async for data in ijson.items(response.content, ""):
+                                        parsed = True
+                                        break
+                                except ijson.JSONError as e:
+                                    return {
+                                        "success": False,
+                                        "status_code": response.status,
+                                        "error": f"Malformed JSON response: {str(e)}"
+                                    }
+                                if not parsed:
+                                    return {
+                                        "success": False,
+                                        "status_code": response.status,
+                                        "error": "Malformed JSON response: empty document"
+                                    }
+                            elif _is_json_content(response):
+                                # Parse with orjson (C, no charset sniffing);
+                                # keep a narrow safety net for mislabeled
+                                # servers
+                                try:
+                                    data = orjson.loads(await response.read())
+                                except orjson.JSONDecodeError:
+                                    data = await _body_text(response)
+                            else:
+                                data = await _body_text(response)
+                            if response.status == 200 and max_bytes == 0:
+                                _cache_response(url, response, data, decode_json)
+                            return _success(response.status, data)
+                        else:
+                            return {
+                                "success": False,
+                                "status_code": response.status,
+                                "error": f"Request failed with status code {response.status}"
+                            }
+                    finally:
+                        response.release()
+            # Back off outside the semaphore so a throttled host doesn't
+            # hold an in-flight slot while it sleeps
+            await asyncio.sleep(delay)
+    except asyncio.TimeoutError as e:
+        return {
+            "success": False,
+            "error": f"Request timed out: {str(e)}"
+        }
+    except aiohttp.ClientConnectionError as e:
+        return {
+            "success": False,
+            "error": f"Connection failed: {str(e)}"
+        }
+    except aiohttp.ClientError as e:
+        return {
+            "success": False,
+            "error": f"Request failed: {str(e)}"
+        }
+
+async def make_requests(urls: list[str], decode_json: bool = False) -> list[dict]:
+    """Fetch several URLs concurrently and return one result per URL.
+
+    A single batched tool call amortizes the per-call overhead and
+    overlaps the network waits; the in-flight semaphore and per-host
+    limiters still bound the fan-out. One bad URL yields its own error
+    entry instead of sinking the whole batch.
+    """
+    results = await asyncio.gather(
+        *(make_request(url, decode_json=decode_json) for url in urls),
+        return_exceptions=True,
+    )
+    return [
+        result if isinstance(result, dict) else {
+            "success": False,
+            "error": f"Request failed: {str(result)}"
+        }
+        for result in results
+    ]
+
 root_agent = Agent(
     model='gemini-2.0-flash-001',
     name='rest_agent',
@@ -46,9 +527,10 @@ When you give me a URL, I will:
 2. Return the response data if successful
 3. Return an error message if the request fails
 4. Handle both JSON and non-JSON responses
+5. Fetch several URLs at once when you give me a list (make_requests)
 
 Example usage:
 User: Get data from https://api.github.com/users/google
 Agent: [Shows the response data or error message]""",
-    tools=[make_request]
+    tools=[make_request, make_requests, probe_request]
 )